@@ -160,6 +160,10 @@ OPTIMIZATION_MEMORY_QUERY_DAYS = get_int("OPTIMIZATION_MEMORY_QUERY_DAYS", requi
 MEMDIR_PRUNE_MAX_AGE_DAYS = get_int("MEMDIR_PRUNE_MAX_AGE_DAYS", required=True)
 MEMDIR_PRUNE_MAX_COUNT = get_int("MEMDIR_PRUNE_MAX_COUNT", required=True)
 MEMDIR_ORGANIZER_MODEL = get_string("MEMDIR_ORGANIZER_MODEL", required=True)
+MEMDIR_ORGANIZER_MAX_CONCURRENCY = get_int("MEMDIR_ORGANIZER_MAX_CONCURRENCY", default=4) # Parallel LLM tagging requests
+MEMDIR_ORGANIZER_REQUESTS_PER_MINUTE = get_int("MEMDIR_ORGANIZER_REQUESTS_PER_MINUTE", default=120) # Provider rate limit for tagging
+MEMDIR_TAG_CACHE_MAX_AGE_DAYS = get_int("MEMDIR_TAG_CACHE_MAX_AGE_DAYS", default=30) # Drop cached tags older than this (0 to disable)
+MEMDIR_TAG_CACHE_MAX_COUNT = get_int("MEMDIR_TAG_CACHE_MAX_COUNT", default=100000) # Max cached tags to keep (0 to disable)
 
 # Orchestration Service - Make required
 MAIN_LOOP_SLEEP_INTERVAL = get_int("MAIN_LOOP_SLEEP_INTERVAL", required=True)
@@ -1,19 +1,31 @@
 import os
-import json
+import re
 import time
-from typing import List, Dict, Any, Optional
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 
-from .storage import MemoryStorage, NEW_DIR, CUR_DIR
+import orjson
+
+from .storage import MemoryStorage, NEW_DIR, join_flags
+from .tag_cache import TagCache, CACHE_DIR, TAG_CACHE_FILENAME
 from ...interfaces.large_language_model import LLMInterface
 from ...models.memory_entry import MemoryEntry, MemoryMetadata, MemoryEntryType
 from ...utils.logger import log
+from ...utils.rate_limiter import RateLimiter
 from ...utils.exceptions import MemoryServiceError, MemdirIOError, LLMError
 from ... import config
 
 # --- Constants ---
 ORGANIZER_SOURCE_SERVICE = "MemoryOrganizer"
 DEFAULT_PROCESS_BATCH_SIZE = 100 # Process N files per run
-DEFAULT_PROCESS_DELAY_SECONDS = 0.1 # Small delay between processing files
+DEFAULT_LLM_BATCH_SIZE = 10 # Entries tagged per LLM request in batched mode
+# Adaptive batching (batch_size=None): start small, grow while LLM latency per entry falls
+ADAPTIVE_BATCH_INITIAL_SIZE = 4
+ADAPTIVE_BATCH_MIN_SIZE = 1
+ADAPTIVE_BATCH_MAX_SIZE = 64
+ADAPTIVE_BATCH_WINDOW = 3 # Full batches measured at a size before trying a larger one
+ADAPTIVE_BATCH_EWMA_ALPHA = 0.3 # Weight of the newest latency sample
 
 # Example prompt structure (adapt as needed)
 MEMORY_TAGGER_PROMPT_TEMPLATE = """
@@ -40,8 +52,34 @@ Example Output:
 }}
 """
 
+# Batched variant: several entries are tagged in one LLM request
+BATCH_MEMORY_TAGGER_PROMPT_TEMPLATE = """
+You are an AI assistant responsible for organizing trading system memory entries.
+Analyze each of the following {count} memory entries independently. Each item has an "idx" and the memory entry under "entry".
+Based ONLY on the content of each entry, perform the following tasks for every entry:
+1.  Identify relevant keywords (max 5, comma-separated). Focus on symbols, actions, statuses, error types, or key metrics.
+2.  Write a concise one-sentence summary of the event described in the memory entry.
+3.  Suggest relevant flags (choose from the allowed list below) that categorize this entry. Include the original entry_type as a flag if applicable (e.g., Flag_Trade, Flag_Error). Add specific flags like Symbol_XYZ based on the payload content.
+
+Allowed Flags: {allowed_flags}
+
+Entries:
+```json
+{memory_entries_json}
+```
+
+Output ONLY a valid JSON object with a single field "results": an array containing one object per entry with the fields "idx", "keywords", "summary", and "suggested_flags". Do not include any other text before or after the JSON object.
+Example Output:
+{{
+  "results": [
+    {{"idx": 0, "keywords": "AAPL, buy, filled, order", "summary": "Successfully executed buy order for 10 shares of AAPL.", "suggested_flags": ["Flag_Trade", "Symbol_AAPL", "Status_Filled"]}}
+  ]
+}}
+"""
+
 # Define allowed flags dynamically or statically
-ALLOWED_FLAGS = [
+# Frozen at import time: O(1) membership checks, and the prompt text is built only once
+ALLOWED_FLAGS = frozenset([
     f"Flag_{mem_type.value}" for mem_type in MemoryEntryType
 ] + [
     "Status_Filled", "Status_Rejected", "Status_Error", "Status_Success",
@@ -50,7 +88,18 @@ ALLOWED_FLAGS = [
     "Risk_High", "Risk_Low",
     "Important"
     # Add Symbol_XYZ dynamically based on content later if needed, or rely on keywords
-]
+])
+# Sorted so the prompt (and therefore LLM output / caching) is stable across runs
+ALLOWED_FLAGS_PROMPT = ", ".join(sorted(ALLOWED_FLAGS))
+
+# Flags accepted into filenames: any "<Category>_<Value>" for the categories used by ALLOWED_FLAGS
+# (plus dynamic Symbol_XYZ flags), or an exact bare flag such as "Important". One precompiled
+# alternation replaces per-prefix startswith loops and also guarantees the flag is filename-safe.
+FLAG_PREFIXES = frozenset(flag.split("_", 1)[0] for flag in ALLOWED_FLAGS if "_" in flag) | {"Symbol"}
+_FLAG_PATTERN = re.compile(
+    r"^(?:(?:" + "|".join(map(re.escape, sorted(FLAG_PREFIXES))) + r")_[A-Za-z0-9_]+"
+    r"|" + "|".join(map(re.escape, sorted(flag for flag in ALLOWED_FLAGS if "_" not in flag))) + r")$"
+)
 
 
 class MemoryOrganizer:
@@ -59,27 +108,118 @@ class MemoryOrganizer:
     and moves them to the 'cur' directory.
     """
 
-    def __init__(self, storage: MemoryStorage, llm_interface: LLMInterface):
+    def __init__(
+        self,
+        storage: MemoryStorage,
+        llm_interface: LLMInterface,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        use_tag_cache: bool = True
+    ):
         self.storage = storage
         self.llm = llm_interface
         # Use the specific model configured for memory organization
         self.tagging_model = config.MEMORY_ORGANIZATION_LLM_MODEL
-        log.info(f"MemoryOrganizer initialized. Using model '{self.tagging_model}' for tagging.")
+        # Concurrent LLM requests per batch, throttled to the provider's rate limit
+        self.max_concurrency = max(1, max_concurrency or config.MEMDIR_ORGANIZER_MAX_CONCURRENCY)
+        rpm = requests_per_minute or config.MEMDIR_ORGANIZER_REQUESTS_PER_MINUTE
+        self._rate_limiter = RateLimiter(requests_per_minute=rpm, burst=self.max_concurrency)
+        # Exact-match cache of generated metadata, persisted inside the Memdir
+        self._tag_cache: Optional[TagCache] = None
+        if use_tag_cache:
+            try:
+                self._tag_cache = TagCache(self.storage.memdir_root / CACHE_DIR / TAG_CACHE_FILENAME)
+            except MemoryServiceError as e:
+                log.warning(f"Tag cache unavailable, every entry will be sent to the LLM: {e}")
+        # Batch size used by process_new_memories_batched(batch_size=None), tuned after every LLM call
+        self._next_batch = ADAPTIVE_BATCH_INITIAL_SIZE
+        self._full_batches_at_size = 0 # Full batches measured since _next_batch last changed
+        self._latency_stats: Dict[str, Any] = {
+            "batches": 0,
+            "rows": 0,
+            "failures": 0,
+            "ewma_latency_per_row": None,
+            "latency_per_row_by_size": {} # Batch size -> EWMA of LLM latency per entry sent
+        }
+        log.info(f"MemoryOrganizer initialized. Using model '{self.tagging_model}' for tagging "
+                 f"(max concurrency: {self.max_concurrency}, rate limit: {rpm}/min).")
+
+    def prune_tag_cache(self) -> int:
+        """Applies the configured age and size limits to the tag cache. Returns the rows deleted."""
+        if not self._tag_cache:
+            return 0
+        return self._tag_cache.prune(
+            max_age_days=config.MEMDIR_TAG_CACHE_MAX_AGE_DAYS,
+            max_count=config.MEMDIR_TAG_CACHE_MAX_COUNT
+        )
+
+    def close(self) -> None:
+        """Releases resources held by the organizer (the tag cache database connection)."""
+        if self._tag_cache:
+            self._tag_cache.close()
+
+    def __enter__(self) -> "MemoryOrganizer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _build_metadata(self, response_json: Any, entry: MemoryEntry) -> Optional[MemoryMetadata]:
+        """Validates a single LLM metadata response and converts it into MemoryMetadata."""
+        if not isinstance(response_json, dict):
+             log.error(f"LLM metadata response is not a dictionary for entry {entry.entry_id}. Response: {response_json}")
+             return None
+
+        keywords_str = response_json.get("keywords")
+        summary = response_json.get("summary")
+        suggested_flags = response_json.get("suggested_flags")
+
+        # Basic validation
+        if not isinstance(keywords_str, str) or not isinstance(summary, str) or not isinstance(suggested_flags, list):
+             log.error(f"Invalid format in LLM metadata response for entry {entry.entry_id}. Response: {response_json}")
+             return None
+
+        keywords = [k.strip() for k in keywords_str.split(',') if k.strip()]
+        # Filter suggested flags against allowed list? Optional, depends on trust level.
+        valid_suggested_flags = [flag for flag in suggested_flags if isinstance(flag, str)] # Basic type check
+        unknown_flags = [flag for flag in valid_suggested_flags if flag not in ALLOWED_FLAGS]
+        if unknown_flags:
+            log.debug(f"LLM suggested flags outside the allowed list for entry {entry.entry_id}: {unknown_flags}")
+
+        metadata = MemoryMetadata(
+            keywords=keywords,
+            summary=summary,
+            suggested_flags=valid_suggested_flags
+            # relationships can be added later if needed
+        )
+        log.debug(f"Generated metadata for entry {entry.entry_id}: {metadata.model_dump()}")
+        return metadata
+
+    def _cache_key(self, entry: MemoryEntry) -> Optional[str]:
+        """Returns the tag cache key for an entry, or None if caching is disabled."""
+        return TagCache.make_key(entry, self.tagging_model) if self._tag_cache else None
 
     def _generate_metadata(self, entry: MemoryEntry) -> Optional[MemoryMetadata]:
         """Uses LLM to generate keywords, summary, and flags for a memory entry."""
         try:
+            cache_key = self._cache_key(entry)
+            if cache_key:
+                cached_metadata = self._tag_cache.get(cache_key)
+                if cached_metadata:
+                    log.debug(f"Tag cache hit for entry {entry.entry_id}")
+                    return cached_metadata
+
             entry_json_str = entry.model_dump_json()
 
             # Prepare the prompt
-            allowed_flags_str = ", ".join(ALLOWED_FLAGS)
             prompt = MEMORY_TAGGER_PROMPT_TEMPLATE.format(
-                allowed_flags=allowed_flags_str,
+                allowed_flags=ALLOWED_FLAGS_PROMPT,
                 memory_json_content=entry_json_str
             )
 
             # Use LLMInterface to get JSON response
             # Use a potentially cheaper/faster model if configured and available
+            self._rate_limiter.acquire()
             response_json = self.llm.generate_json_response(
                 prompt=prompt,
                 model_name=self.tagging_model,
@@ -87,31 +227,9 @@ class MemoryOrganizer:
                 max_tokens=200 # Adjust as needed
             )
 
-            # Validate and parse the response
-            if not isinstance(response_json, dict):
-                 log.error(f"LLM metadata response is not a dictionary for entry {entry.entry_id}. Response: {response_json}")
-                 return None
-
-            keywords_str = response_json.get("keywords")
-            summary = response_json.get("summary")
-            suggested_flags = response_json.get("suggested_flags")
-
-            # Basic validation
-            if not isinstance(keywords_str, str) or not isinstance(summary, str) or not isinstance(suggested_flags, list):
-                 log.error(f"Invalid format in LLM metadata response for entry {entry.entry_id}. Response: {response_json}")
-                 return None
-
-            keywords = [k.strip() for k in keywords_str.split(',') if k.strip()]
-            # Filter suggested flags against allowed list? Optional, depends on trust level.
-            valid_suggested_flags = [flag for flag in suggested_flags if isinstance(flag, str)] # Basic type check
-
-            metadata = MemoryMetadata(
-                keywords=keywords,
-                summary=summary,
-                suggested_flags=valid_suggested_flags
-                # relationships can be added later if needed
-            )
-            log.debug(f"Generated metadata for entry {entry.entry_id}: {metadata.model_dump()}")
+            metadata = self._build_metadata(response_json, entry)
+            if metadata and cache_key:
+                self._tag_cache.put(cache_key, metadata)
             return metadata
 
         except LLMError as e:
@@ -121,41 +239,170 @@ class MemoryOrganizer:
             log.error(f"Unexpected error generating metadata for entry {entry.entry_id}: {e}", exc_info=True)
             return None
 
-    def process_single_entry(self, filename_new: str) -> bool:
-        """Processes a single file from the 'new' directory."""
-        log.debug(f"Processing new memory file: {filename_new}")
+    def _generate_metadata_batch(self, entries: List[MemoryEntry], adaptive: bool = False) -> List[Optional[MemoryMetadata]]:
+        """
+        Uses a single LLM call to generate metadata for several memory entries.
+        If `adaptive` is set (the batch was sized by `self._next_batch`), the call's latency
+        or failure tunes the next adaptive batch size.
+
+        Returns a list aligned with `entries`; positions the LLM did not answer
+        (or answered invalidly) are None, so those entries are moved without metadata.
+        """
+        results: List[Optional[MemoryMetadata]] = [None] * len(entries)
+        try:
+            cache_keys = [self._cache_key(entry) for entry in entries]
+
+            # Serve cache hits directly; only the misses are sent to the LLM
+            pending: List[int] = []
+            for pos, cache_key in enumerate(cache_keys):
+                cached_metadata = self._tag_cache.get(cache_key) if cache_key else None
+                if cached_metadata:
+                    results[pos] = cached_metadata
+                else:
+                    pending.append(pos)
+            if not pending:
+                return results
+
+            batch_items = [{"idx": idx, "entry": entries[pos].model_dump(mode="json")} for idx, pos in enumerate(pending)]
+            prompt = BATCH_MEMORY_TAGGER_PROMPT_TEMPLATE.format(
+                allowed_flags=ALLOWED_FLAGS_PROMPT,
+                count=len(pending),
+                memory_entries_json=orjson.dumps(batch_items).decode('utf-8')
+            )
+
+            self._rate_limiter.acquire()
+            started = time.monotonic()
+            try:
+                response_json = self.llm.generate_json_response(
+                    prompt=prompt,
+                    model_name=self.tagging_model,
+                    temperature=0.2,
+                    max_tokens=200 * len(pending) # Same per-entry budget as the single-entry path
+                )
+            except LLMError:
+                if adaptive:
+                    self._record_batch_failure()
+                raise
+            if adaptive:
+                self._record_batch_latency(len(entries), len(pending), time.monotonic() - started)
+
+            # Accept a bare array as well as the {"results": [...]} wrapper (JSON mode requires an object)
+            if isinstance(response_json, dict):
+                response_json = response_json.get("results")
+            if not isinstance(response_json, list):
+                log.error(f"LLM batch metadata response is not a list of results. Response: {response_json}")
+                return results
+
+            for item in response_json:
+                idx = item.get("idx") if isinstance(item, dict) else None
+                if not isinstance(idx, int) or not 0 <= idx < len(pending):
+                    log.warning(f"Ignoring LLM batch result with invalid idx: {item}")
+                    continue
+                pos = pending[idx]
+                results[pos] = self._build_metadata(item, entries[pos])
+                if results[pos] and cache_keys[pos]:
+                    self._tag_cache.put(cache_keys[pos], results[pos])
+
+        except LLMError as e:
+            log.error(f"LLM error generating batch metadata for {len(entries)} entries: {e}", exc_info=True)
+        except Exception as e:
+            log.error(f"Unexpected error generating batch metadata for {len(entries)} entries: {e}", exc_info=True)
+
+        return results
+
+    @staticmethod
+    def _ewma(previous: Optional[float], sample: float) -> float:
+        """Folds `sample` into an exponentially weighted moving average (None starts a new one)."""
+        return sample if previous is None else ADAPTIVE_BATCH_EWMA_ALPHA * sample + (1 - ADAPTIVE_BATCH_EWMA_ALPHA) * previous
+
+    def _set_next_batch(self, batch_size: int) -> None:
+        """Switches the adaptive batch size and restarts the measurement window."""
+        self._next_batch = batch_size
+        self._full_batches_at_size = 0
+
+    def _record_batch_latency(self, batch_rows: int, llm_rows: int, elapsed_seconds: float) -> None:
+        """
+        Folds one adaptive batch LLM call into the latency stats and picks the next batch size.
+
+        `batch_rows` is the number of entries in the batch (tag cache hits included), `llm_rows`
+        the number actually sent to the LLM. The latency per entry is kept for every size tried:
+        a size that turns out slower per entry than the next smaller one is backed off at once,
+        and a larger size is only tried after a full window of batches at the current one.
+        """
+        stats = self._latency_stats
+        by_size = stats["latency_per_row_by_size"]
+        latency_per_row = elapsed_seconds / llm_rows
+        stats["batches"] += 1
+        stats["rows"] += batch_rows
+        stats["ewma_latency_per_row"] = self._ewma(stats["ewma_latency_per_row"], latency_per_row)
+
+        # Only a full batch measures the current size; a short batch just means 'new' ran dry
+        size = self._next_batch
+        if batch_rows < size:
+            return
+        by_size[size] = self._ewma(by_size.get(size), latency_per_row)
+        self._full_batches_at_size += 1
+
+        smaller = [tried for tried in by_size if tried < size]
+        larger = min(ADAPTIVE_BATCH_MAX_SIZE, size * 2)
+        if smaller and by_size[size] > by_size[max(smaller)]:
+            # Bigger batches got slower per entry: go back to the previous size
+            self._set_next_batch(max(smaller))
+        elif (self._full_batches_at_size >= ADAPTIVE_BATCH_WINDOW and larger > size
+              and (larger not in by_size or by_size[larger] <= by_size[size])):
+            self._set_next_batch(larger)
+        log.debug(f"Batch of {batch_rows} entries ({llm_rows} sent to the LLM) tagged in {elapsed_seconds:.3f}s; "
+                  f"next adaptive batch size: {self._next_batch}")
+
+    def _record_batch_failure(self) -> None:
+        """Halves the next adaptive batch size after a failed (e.g. timed out) batch LLM call."""
+        self._latency_stats["failures"] += 1
+        self._set_next_batch(max(ADAPTIVE_BATCH_MIN_SIZE, self._next_batch // 2))
+        log.debug(f"Batch LLM call failed; next adaptive batch size: {self._next_batch}")
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """Returns the batch LLM call statistics and the batch size the next adaptive run will use."""
+        stats = dict(self._latency_stats)
+        stats["latency_per_row_by_size"] = dict(stats["latency_per_row_by_size"])
+        return {**stats, "next_batch_size": self._next_batch}
+
+    @staticmethod
+    def _build_flag_suffix(flags: Iterable[str]) -> str:
+        """
+        Builds the Maildir info suffix for a set of flags: ':2,' followed by the sorted flags,
+        comma-separated so multi-character flags stay distinguishable. Sorted and joined in
+        one pass. According to Maildir spec, if there are no flags the ':2,' part is omitted.
+        """
+        flags_str = join_flags(flags)
+        return f":2,{flags_str}" if flags_str else ""
+
+    def _apply_metadata_and_move(self, filename_new: str, entry: MemoryEntry, ai_metadata: Optional[MemoryMetadata]) -> bool:
+        """Attaches the AI metadata (if any) to an entry read from 'new' and moves it to 'cur' with flags."""
         new_filepath = os.path.join(self.storage.new_path, filename_new)
         processed_successfully = False
         tmp_proc_filepath = None # Initialize here
 
         try:
-            # 1. Read the original entry
-            entry = self.storage.read_memory(NEW_DIR, filename_new)
-
-            # 2. Generate AI Metadata
-            ai_metadata = self._generate_metadata(entry)
-
-            # 3. Update the entry object
+            # 1. Update the entry object
             if ai_metadata:
                 entry.metadata = ai_metadata
                 log.info(f"Added AI metadata to entry {entry.entry_id}")
             else:
                 log.warning(f"Proceeding without AI metadata for entry {entry.entry_id} ({filename_new})")
 
-            # 4. Determine final flags
-            final_flags = set("S") # Add 'Seen' flag
+            # 2. Determine final flags
+            final_flags = {"S"} # Add 'Seen' flag
             if ai_metadata and ai_metadata.suggested_flags:
-                 # Add suggested flags, potentially filtering/validating them further
-                 # For now, add all string flags returned
-                 valid_ai_flags = {flag for flag in ai_metadata.suggested_flags if isinstance(flag, str)}
+                 # Add suggested flags that match a known category (and are safe in a filename)
+                 valid_ai_flags = {flag for flag in ai_metadata.suggested_flags if isinstance(flag, str) and _FLAG_PATTERN.match(flag)}
                  final_flags.update(valid_ai_flags)
                  # Add symbol flag if present in payload
                  if 'symbol' in entry.payload and isinstance(entry.payload['symbol'], str):
-                      final_flags.add(f"Symbol_{entry.payload['symbol'].upper()}")
-
-            final_flags_str = "".join(sorted(list(final_flags)))
+                      symbol_flag = f"Symbol_{entry.payload['symbol'].upper()}"
+                      if _FLAG_PATTERN.match(symbol_flag):
+                           final_flags.add(symbol_flag)
 
-            # 5. Save updated entry to a temporary location (using storage's atomic save logic indirectly)
+            # 3. Save updated entry to a temporary location (using storage's atomic save logic indirectly)
             # We need to write the *updated* content. Let's write directly to tmp, then move to cur.
             updated_entry_json = entry.model_dump_json(indent=2)
             updated_entry_bytes = updated_entry_json.encode('utf-8')
@@ -164,28 +411,20 @@ class MemoryOrganizer:
             tmp_proc_filename = f"proc_{filename_new}" # Add prefix to avoid collision
             tmp_proc_filepath = os.path.join(self.storage.tmp_path, tmp_proc_filename)
 
-            with open(tmp_proc_filepath, 'wb') as f:
-                f.write(updated_entry_bytes)
-
-            # 6. Determine final filename in 'cur'
+            # 4. Determine final filename in 'cur'
             parsed_original = self.storage._parse_filename(filename_new)
             if not parsed_original:
                  raise MemdirIOError(f"Cannot process file: Failed to parse original filename {filename_new}")
 
             filename_base = f"{parsed_original['timestamp_ns']}.{parsed_original['unique_id']}.{parsed_original['hostname']}"
-            # Ensure :2, is added only if flags exist
-            if final_flags_str:
-                cur_filename = f"{filename_base}:2,{final_flags_str}"
-            else:
-                # According to Maildir spec, if no flags, the :2, part is omitted.
-                cur_filename = filename_base
+            cur_filename = filename_base + self._build_flag_suffix(final_flags)
             cur_filepath = os.path.join(self.storage.cur_path, cur_filename)
 
-            # 7. Atomically move the processed temporary file to the final 'cur' location
-            os.rename(tmp_proc_filepath, cur_filepath)
+            # 5. Write the processed entry to tmp and atomically move it to the final 'cur' location
+            self.storage._write_bytes_atomic(tmp_proc_filepath, cur_filepath, updated_entry_bytes)
             log.debug(f"Moved processed file to {cur_filepath}")
 
-            # 8. Delete the original file from 'new'
+            # 6. Delete the original file from 'new'
             try:
                 os.remove(new_filepath)
                 log.info(f"Successfully processed and moved '{filename_new}' to '{cur_filename}' in cur.")
@@ -211,6 +450,39 @@ class MemoryOrganizer:
 
         return processed_successfully
 
+    def _read_new_entry(self, filename_new: str) -> Optional[MemoryEntry]:
+        """Reads an entry from 'new', logging and returning None on failure."""
+        try:
+            return self.storage.read_memory(NEW_DIR, filename_new)
+        except (MemdirIOError, FileNotFoundError) as e:
+            log.error(f"Filesystem error processing {filename_new}: {e}", exc_info=True)
+        except Exception as e:
+            log.error(f"Unexpected error processing {filename_new}: {e}", exc_info=True)
+        return None
+
+    def process_single_entry(self, filename_new: str) -> bool:
+        """Processes a single file from the 'new' directory."""
+        log.debug(f"Processing new memory file: {filename_new}")
+
+        # 1. Read the original entry
+        entry = self._read_new_entry(filename_new)
+        if entry is None:
+            return False
+
+        # 2. Generate AI Metadata
+        ai_metadata = self._generate_metadata(entry)
+
+        # 3. Attach metadata, flag and move to 'cur'
+        return self._apply_metadata_and_move(filename_new, entry, ai_metadata)
+
+
+    def _oldest_new_files(self, batch_size: int) -> List[str]:
+        """
+        Returns up to `batch_size` of the oldest filenames in 'new', consuming the directory
+        stream lazily and keeping only a bounded heap instead of the full listing.
+        """
+        # Filenames start with the nanosecond timestamp, so name order is age order
+        return heapq.nsmallest(batch_size, self.storage.iter_files(NEW_DIR))
 
     def process_new_memories(self, batch_size: int = DEFAULT_PROCESS_BATCH_SIZE) -> int:
         """
@@ -224,32 +496,74 @@ class MemoryOrganizer:
         """
         processed_count = 0
         try:
-            new_files = self.storage.list_files(NEW_DIR)
-            if not new_files:
+            batch_files = self._oldest_new_files(batch_size)
+            if not batch_files:
                 log.debug("No new memory files to process.")
                 return 0
 
-            log.info(f"Found {len(new_files)} new memory files. Processing up to {batch_size}...")
+            log.info(f"Processing {len(batch_files)} new memory files (batch size limit: {batch_size})...")
+
+            # LLM calls are I/O bound and independent per file, so run them concurrently.
+            # The rate limiter inside _generate_metadata keeps us under the provider's limit.
+            max_workers = max(1, min(self.max_concurrency, len(batch_files)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-organizer") as executor:
+                for processed in executor.map(self.process_single_entry, batch_files):
+                    if processed:
+                        processed_count += 1
+
+        except MemdirIOError as e:
+            log.error(f"Failed to list files in 'new' directory: {e}", exc_info=True)
+        except Exception as e:
+            log.error(f"Unexpected error during processing of new memories: {e}", exc_info=True)
 
-            # Sort files (e.g., oldest first) to process in order
-            new_files.sort()
+        log.info(f"Finished processing batch. Successfully processed {processed_count} files.")
+        return processed_count
 
-            for i, filename in enumerate(new_files):
-                if i >= batch_size:
-                    log.info(f"Reached batch size limit ({batch_size}). Will process remaining files later.")
-                    break
+    def process_new_memories_batched(self, batch_size: Optional[int] = DEFAULT_LLM_BATCH_SIZE) -> int:
+        """
+        Processes a batch of files from the 'new' directory using a single LLM call
+        for the whole batch instead of one call per file.
 
-                if self.process_single_entry(filename):
-                    processed_count += 1
+        Args:
+            batch_size: The maximum number of files to tag in one LLM request.
+                        A batch size of 1 falls back to `process_new_memories`.
+                        None tunes the batch size from recent LLM latency (see `get_batch_stats`).
+                        Adaptive batching is opt-in; the daemon uses `process_new_memories`.
+
+        Returns:
+            The number of files successfully processed.
+        """
+        adaptive = batch_size is None
+        if adaptive:
+            batch_size = self._next_batch
+        elif batch_size <= 1:
+            return self.process_new_memories(batch_size=batch_size)
 
-                # Optional small delay to avoid overwhelming resources/APIs
-                time.sleep(DEFAULT_PROCESS_DELAY_SECONDS)
+        processed_count = 0
+        try:
+            batch_files = self._oldest_new_files(batch_size)
+            if not batch_files:
+                log.debug("No new memory files to process.")
+                return 0
 
+            log.info(f"Tagging {len(batch_files)} new memory files in a single LLM request...")
+
+            batch: List[Tuple[str, MemoryEntry]] = []
+            for filename in batch_files:
+                entry = self._read_new_entry(filename)
+                if entry is not None:
+                    batch.append((filename, entry))
+
+            metadata_list = self._generate_metadata_batch([entry for _, entry in batch], adaptive=adaptive)
+
+            for (filename, entry), ai_metadata in zip(batch, metadata_list):
+                if self._apply_metadata_and_move(filename, entry, ai_metadata):
+                    processed_count += 1
 
         except MemdirIOError as e:
             log.error(f"Failed to list files in 'new' directory: {e}", exc_info=True)
         except Exception as e:
-            log.error(f"Unexpected error during processing of new memories: {e}", exc_info=True)
+            log.error(f"Unexpected error during batched processing of new memories: {e}", exc_info=True)
 
         log.info(f"Finished processing batch. Successfully processed {processed_count} files.")
         return processed_count
@@ -1,13 +1,17 @@
 import os
-import json
+import mmap
 import uuid
 import time
 import shutil
+from functools import lru_cache
 from pathlib import Path # Import Path
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Union, Iterator, Iterable, Set
 import re
 
+import orjson
+from pydantic import TypeAdapter, ValidationError
+
 from ... import config
 from ...utils.logger import log
 from ...utils.exceptions import MemoryServiceError, MemdirIOError, MemoryQueryError
@@ -22,12 +26,55 @@ INDEX_DIR = "index" # Optional index directory within cur
 
 # Filename format: <timestamp_ns>.<unique_id>.<hostname>[:2,<flags>]
 # Flags are Maildir-style (e.g., :2,S for Seen). The :2, part is optional if no flags.
+# Several flags are comma-separated (e.g., :2,S,Status_Success) so multi-character flags stay distinguishable.
 # Updated regex to allow more characters in flags (word chars, hyphen, comma)
-FILENAME_REGEX = re.compile(r"^(\d+)\.([^.]+)\.([^:]+?)(?::2,([\w,-]*))?$") # Made hostname non-greedy, flags more permissive
+# Compiled once at import. The hostname class excludes ':', so a greedy hostname match stops exactly
+# at the optional ':2,' suffix without backtracking (a non-greedy one re-tries the suffix per character).
+FILENAME_REGEX = re.compile(r"^(\d+)\.([^.]+)\.([^:]+)(?::2,([\w,-]*))?$") # Flags more permissive
 # Groups: 1=timestamp_ns, 2=unique_id, 3=hostname, 4=flags(optional)
 
 HOSTNAME = os.uname().nodename # Get hostname once
 
+FLAG_SEPARATOR = ","
+
+MMAP_READ_THRESHOLD_BYTES = 64 * 1024 # Files larger than this are parsed from an mmap instead of a copy
+
+
+def split_flags(flags: Union[str, Iterable[str], None]) -> Set[str]:
+    """Returns the set of flags in a comma-separated flag string (as stored in filenames) or an iterable of flags."""
+    if not flags:
+        return set()
+    if isinstance(flags, str):
+        flags = flags.split(FLAG_SEPARATOR)
+    return {flag for flag in flags if flag}
+
+def join_flags(flags: Iterable[str]) -> str:
+    """Joins flags into the sorted, comma-separated form stored in filenames."""
+    return FLAG_SEPARATOR.join(sorted(flags))
+
+
+@lru_cache(maxsize=8192)
+def _parse_filename_cached(filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Pure parse of a Memdir filename, memoized: filenames are immutable and the same
+    names are parsed repeatedly by listing, querying, pruning and the organizer.
+    Returns None if the filename does not match the Memdir format.
+    """
+    match = FILENAME_REGEX.match(filename)
+    if not match:
+        return None
+    # Groups: 1=timestamp_ns, 2=unique_id, 3=hostname, 4=flags(optional)
+    ts_ns_str, unique_id, hostname, flags_str = match.groups()
+    ts_ns = int(ts_ns_str)
+    return {
+        "timestamp_ns": ts_ns,
+        "unique_id": unique_id,
+        "hostname": hostname,
+        "size": None, # Explicitly add size as None as it's not captured by regex
+        "flags": flags_str if flags_str is not None else "", # Handle case where flags group doesn't match
+        "timestamp_dt": datetime.fromtimestamp(ts_ns / 1e9, tz=timezone.utc)
+    }
+
 
 class MemoryStorage:
     """
@@ -47,6 +94,9 @@ class MemoryStorage:
         self.new_path.mkdir(parents=True, exist_ok=True)
         self.cur_path.mkdir(parents=True, exist_ok=True)
         self.index_path.mkdir(parents=True, exist_ok=True) # Create index dir too
+
+        # Reused for every read so the core-schema validator is bound once, not looked up per file
+        self._entry_adapter = TypeAdapter(MemoryEntry)
         log.info(f"MemoryStorage initialized. Memdir root: {self.memdir_root}")
 
     def _generate_unique_id(self) -> str:
@@ -71,70 +121,111 @@ class MemoryStorage:
 
     def _parse_filename(self, filename: str) -> Optional[Dict[str, Any]]:
         """Parses a Memdir filename into its components."""
-        match = FILENAME_REGEX.match(filename)
-        if match:
-            # Groups: 1=timestamp_ns, 2=unique_id, 3=hostname, 4=flags(optional)
-            ts_ns, unique_id, hostname, flags_str = match.groups()
-            return {
-                "timestamp_ns": int(ts_ns),
-                "unique_id": unique_id,
-                "hostname": hostname,
-                "size": None, # Explicitly add size as None as it's not captured by regex
-                "flags": flags_str if flags_str is not None else "", # Handle case where flags group doesn't match
-                "timestamp_dt": datetime.fromtimestamp(int(ts_ns) / 1e9, tz=timezone.utc)
-            }
-        else: # Correctly indented else block
+        parsed = _parse_filename_cached(filename)
+        if parsed is None:
             log.warning(f"Could not parse filename: {filename}")
             return None
+        return dict(parsed) # Copy so callers cannot mutate the cached result
 
-    def save_memory(self, entry: MemoryEntry) -> str:
+    def _write_bytes_atomic(self, tmp_filepath: Union[str, Path], final_filepath: Union[str, Path], data: bytes) -> None:
         """
-        Saves a MemoryEntry object to a new file in the 'new' directory.
-        Uses atomic write (write to tmp, then move).
-
-        Args:
-            entry: The MemoryEntry object to save.
-
-        Returns:
-            The filename (without path) of the newly created memory file in 'new'.
-
-        Raises:
-            MemdirIOError: If saving fails.
+        Writes `data` to `tmp_filepath` using raw os-level calls (no buffered text layer),
+        then atomically renames it to `final_filepath`. The caller cleans up on failure.
+        """
+        fd = os.open(tmp_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view: # os.write may write fewer bytes than requested
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+        os.rename(tmp_filepath, final_filepath)
+
+    def _parse_entry_file(self, filepath: Union[str, Path]) -> MemoryEntry:
+        """
+        Reads and validates a MemoryEntry file. Small files are parsed and validated in a single
+        pass by the cached TypeAdapter, without an intermediate dict; large files are mapped into
+        memory and parsed by orjson without copying them first.
         """
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_READ_THRESHOLD_BYTES:
+                return self._entry_adapter.validate_json(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return self._entry_adapter.validate_python(orjson.loads(view))
+
+    def _serialize_entry(self, entry: MemoryEntry) -> bytes:
+        """Serializes a MemoryEntry to the UTF-8 JSON bytes stored in a Memdir file."""
         try:
             entry_json = entry.model_dump_json(indent=2)
-            entry_bytes = entry_json.encode('utf-8')
+            return entry_json.encode('utf-8')
         except Exception as e:
             log.error(f"Failed to serialize MemoryEntry (ID: {entry.entry_id}): {e}", exc_info=True)
             raise MemdirIOError(f"Serialization failed for entry {entry.entry_id}: {e}") from e
 
+    def _store_entry_bytes(self, entry_id: str, entry_bytes: bytes) -> str:
+        """Atomically stores already-serialized entry bytes in 'new' (write to tmp, then move)."""
         tmp_filename = self._generate_filename() # No flags/size needed for tmp name itself
         tmp_filepath = self.tmp_path / tmp_filename # Use Path object
         new_filename = self._generate_filename() # Final name for the 'new' dir (no flags yet)
         new_filepath = self.new_path / new_filename # Use Path object
 
         try:
-            # Write to temporary file first using Path object
-            tmp_filepath.write_bytes(entry_bytes)
+            # Write to temporary file first, then atomically move from tmp to new
+            self._write_bytes_atomic(tmp_filepath, new_filepath, entry_bytes)
 
-            # Atomically move from tmp to new using Path.rename
-            tmp_filepath.rename(new_filepath)
-
-            log.debug(f"Saved memory entry {entry.entry_id} to {new_filepath}")
+            log.debug(f"Saved memory entry {entry_id} to {new_filepath}")
             return new_filename # Return just the filename part
 
         except OSError as e:
-            log.error(f"OS Error saving memory entry {entry.entry_id} (tmp: {tmp_filepath}, new: {new_filepath}): {e}", exc_info=True)
+            log.error(f"OS Error saving memory entry {entry_id} (tmp: {tmp_filepath}, new: {new_filepath}): {e}", exc_info=True)
             # Clean up tmp file if it exists using Path.unlink
             if tmp_filepath.exists():
                 try:
                     tmp_filepath.unlink()
                 except OSError as cleanup_e:
                     log.error(f"Failed to clean up temporary file {tmp_filepath}: {cleanup_e}")
-            raise MemdirIOError(f"Failed to save memory entry {entry.entry_id}: {e}") from e
+            raise MemdirIOError(f"Failed to save memory entry {entry_id}: {e}") from e
         except Exception as e:
-            log.error(f"Unexpected error saving memory entry {entry.entry_id}: {e}", exc_info=True)
-            raise MemdirIOError(f"Unexpected error saving memory entry {entry.entry_id}: {e}") from e
+            log.error(f"Unexpected error saving memory entry {entry_id}: {e}", exc_info=True)
+            raise MemdirIOError(f"Unexpected error saving memory entry {entry_id}: {e}") from e
+
+    def save_memory(self, entry: MemoryEntry) -> str:
+        """
+        Saves a MemoryEntry object to a new file in the 'new' directory.
+        Uses atomic write (write to tmp, then move).
+
+        Args:
+            entry: The MemoryEntry object to save.
+
+        Returns:
+            The filename (without path) of the newly created memory file in 'new'.
+
+        Raises:
+            MemdirIOError: If saving fails.
+        """
+        return self._store_entry_bytes(entry.entry_id, self._serialize_entry(entry))
+
+    def bulk_save(self, entries: List[MemoryEntry]) -> List[str]:
+        """
+        Saves several MemoryEntry objects to the 'new' directory.
+        All entries are serialized up front, so a serialization error leaves the Memdir untouched;
+        each file is then written with the same atomic tmp -> new move as save_memory.
+
+        Args:
+            entries: The MemoryEntry objects to save.
+
+        Returns:
+            The filenames (without path) in 'new', in the same order as `entries`.
+
+        Raises:
+            MemdirIOError: If serialization or saving fails. Entries saved before an
+                           I/O failure remain in 'new'.
+        """
+        serialized = [(entry.entry_id, self._serialize_entry(entry)) for entry in entries]
+        filenames = [self._store_entry_bytes(entry_id, entry_bytes) for entry_id, entry_bytes in serialized]
+        log.debug(f"Bulk saved {len(filenames)} memory entries to {self.new_path}")
+        return filenames
 
     def read_memory(self, directory: str, filename: str) -> MemoryEntry:
         """
@@ -159,29 +250,32 @@ class MemoryStorage:
         log.debug(f"Reading memory file: {filepath}")
 
         try:
-            # Use Path object methods for reading
-            entry_json = filepath.read_text(encoding='utf-8')
-            entry_data = json.loads(entry_json)
-            entry = MemoryEntry(**entry_data)
-            return entry
+            return self._parse_entry_file(filepath)
         except FileNotFoundError:
             log.error(f"Memory file not found: {filepath}")
             raise
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e: # Subclass of json.JSONDecodeError
             log.error(f"Failed to decode JSON from memory file {filepath}: {e}", exc_info=True)
             raise MemdirIOError(f"JSON decode error in {filepath}: {e}") from e
-        except Exception as e: # Catches Pydantic validation errors too
+        except ValidationError as e:
+            # pydantic-core reports malformed JSON as a validation error of type 'json_invalid'
+            if any(error["type"] == "json_invalid" for error in e.errors()):
+                log.error(f"Failed to decode JSON from memory file {filepath}: {e}", exc_info=True)
+                raise MemdirIOError(f"JSON decode error in {filepath}: {e}") from e
+            log.error(f"Failed to validate memory file {filepath}: {e}", exc_info=True)
+            raise MemdirIOError(f"Failed to process memory file {filepath}: {e}") from e
+        except Exception as e: # Any other OS or unexpected error while reading
             log.error(f"Failed to read or parse memory file {filepath}: {e}", exc_info=True)
             raise MemdirIOError(f"Failed to process memory file {filepath}: {e}") from e
 
-    def update_flags(self, filename: str, add_flags: Optional[str] = None, remove_flags: Optional[str] = None) -> str:
+    def update_flags(self, filename: str, add_flags: Union[str, Iterable[str], None] = None, remove_flags: Union[str, Iterable[str], None] = None) -> str:
         """
         Updates the flags of a memory file located in the 'cur' directory by renaming it.
 
         Args:
             filename: The current filename in the 'cur' directory.
-            add_flags: String containing flags to add (e.g., "ST").
-            remove_flags: String containing flags to remove.
+            add_flags: Flags to add, comma-separated (e.g., "S,T") or as an iterable.
+            remove_flags: Flags to remove, in the same form.
 
         Returns:
             The new filename with updated flags.
@@ -199,13 +293,11 @@ class MemoryStorage:
         if not parsed:
             raise MemdirIOError(f"Cannot update flags: Failed to parse filename {filename}")
 
-        current_flags = set(parsed.get("flags", ""))
-        if add_flags:
-            current_flags.update(add_flags)
-        if remove_flags:
-            current_flags.difference_update(remove_flags)
+        current_flags = split_flags(parsed.get("flags", ""))
+        current_flags.update(split_flags(add_flags))
+        current_flags.difference_update(split_flags(remove_flags))
 
-        new_flags_str = "".join(sorted(list(current_flags))) # Keep flags sorted
+        new_flags_str = join_flags(current_flags) # Keep flags sorted
 
         # Reconstruct filename base
         filename_base = f"{parsed['timestamp_ns']}.{parsed['unique_id']}.{parsed['hostname']}"
@@ -231,7 +323,7 @@ class MemoryStorage:
             log.error(f"OS Error updating flags for {filename} -> {new_filename}: {e}", exc_info=True)
             raise MemdirIOError(f"Failed to update flags for {filename}: {e}") from e
 
-    def move_memory(self, source_dir: str, filename: str, dest_dir: str = CUR_DIR, add_flags: Optional[str] = None) -> str:
+    def move_memory(self, source_dir: str, filename: str, dest_dir: str = CUR_DIR, add_flags: Union[str, Iterable[str], None] = None) -> str:
         """
         Moves a memory file between directories (e.g., new -> cur) and optionally adds flags.
 
@@ -239,7 +331,8 @@ class MemoryStorage:
             source_dir: The source directory ('new' or 'cur').
             filename: The filename to move.
             dest_dir: The destination directory (usually 'cur').
-            add_flags: Optional flags to add during the move (applied to the destination filename).
+            add_flags: Optional flags to add during the move (applied to the destination filename),
+                       comma-separated or as an iterable.
 
         Returns:
             The final filename in the destination directory.
@@ -262,10 +355,9 @@ class MemoryStorage:
         if not parsed:
             raise MemdirIOError(f"Cannot move file: Failed to parse filename {filename}")
 
-        current_flags = set(parsed.get("flags", ""))
-        if add_flags:
-            current_flags.update(add_flags)
-        new_flags_str = "".join(sorted(list(current_flags)))
+        current_flags = split_flags(parsed.get("flags", ""))
+        current_flags.update(split_flags(add_flags))
+        new_flags_str = join_flags(current_flags)
 
         # Construct destination filename
         filename_base = f"{parsed['timestamp_ns']}.{parsed['unique_id']}.{parsed['hostname']}"
@@ -284,26 +376,41 @@ class MemoryStorage:
             log.error(f"OS Error moving file {filename} from {source_dir} to {dest_dir}: {e}", exc_info=True)
             raise MemdirIOError(f"Failed to move file {filename}: {e}") from e
 
-    def list_files(self, directory: str) -> List[str]:
-         """Lists all files directly within a specified Memdir subdirectory (new or cur)."""
+    def iter_files(self, directory: str) -> Iterator[str]:
+         """
+         Lazily yields the names of files directly within a Memdir subdirectory (new, cur or tmp),
+         in directory order, without materializing the full listing.
+         """
          if directory not in [NEW_DIR, CUR_DIR, TMP_DIR]:
               raise ValueError(f"Invalid directory specified for listing: {directory}")
 
          path = self.memdir_root / directory # Use Path object
          try:
-              # Use Path.iterdir() and check if it's a file
-              return [f.name for f in path.iterdir() if f.is_file()]
+              # Single os.scandir pass: DirEntry.is_file() uses the cached d_type, avoiding a stat per file
+              with os.scandir(path) as entries:
+                   for entry in entries:
+                        if entry.is_file():
+                             yield entry.name
          except OSError as e:
               log.error(f"Error listing files in {path}: {e}", exc_info=True)
               raise MemdirIOError(f"Failed to list files in {directory}: {e}") from e
 
+    def list_files(self, directory: str) -> List[str]:
+         """Lists all files directly within a specified Memdir subdirectory (new or cur), sorted by name."""
+         return sorted(self.iter_files(directory))
+
+
+    def count_files(self, directory: str) -> int:
+         """Counts the files directly within a Memdir subdirectory without building a list."""
+         return sum(1 for _ in self.iter_files(directory))
+
 
     def query_memories(
         self,
         time_start: Optional[datetime] = None,
         time_end: Optional[datetime] = None,
-        flags_include: Optional[str] = None,
-        flags_exclude: Optional[str] = None,
+        flags_include: Union[str, Iterable[str], None] = None,
+        flags_exclude: Union[str, Iterable[str], None] = None,
         max_results: Optional[int] = None,
         content_keywords: Optional[List[str]] = None # Basic keyword search (slow)
         ) -> List[Tuple[str, Dict[str, Any]]]: # Returns list of (filename, parsed_info)
@@ -315,8 +422,8 @@ class MemoryStorage:
         Args:
             time_start: Minimum timestamp (inclusive).
             time_end: Maximum timestamp (exclusive).
-            flags_include: String of flags that MUST be present.
-            flags_exclude: String of flags that MUST NOT be present.
+            flags_include: Flags that MUST be present (comma-separated or an iterable).
+            flags_exclude: Flags that MUST NOT be present.
             max_results: Maximum number of results to return.
             content_keywords: List of keywords to search for in the file content (SLOW).
 
@@ -327,6 +434,8 @@ class MemoryStorage:
         log.debug(f"Querying memories in 'cur': start={time_start}, end={time_end}, incl='{flags_include}', excl='{flags_exclude}', keywords='{content_keywords}'")
         results = []
         files_scanned = 0
+        required_flags = split_flags(flags_include)
+        excluded_flags = split_flags(flags_exclude)
 
         try:
             # Iterate through files in 'cur' directory, sorting by name might help slightly
@@ -351,10 +460,10 @@ class MemoryStorage:
                     continue
 
                 # --- Filter by Flags ---
-                file_flags = set(parsed_info.get("flags", ""))
-                if flags_include and not set(flags_include).issubset(file_flags):
+                file_flags = split_flags(parsed_info.get("flags", ""))
+                if not required_flags.issubset(file_flags):
                     continue
-                if flags_exclude and not set(flags_exclude).isdisjoint(file_flags):
+                if not excluded_flags.isdisjoint(file_flags):
                     continue
 
                 # --- Filter by Content Keywords (SLOW) ---
@@ -495,7 +604,7 @@ class MemoryStorage:
 #         # Move to 'cur' with flags
 #         cur_fname1 = storage.move_memory(NEW_DIR, fname1, add_flags="S") # Mark as Seen
 #         print(f"Moved {fname1} to 'cur' as {cur_fname1}")
-#         cur_fname2 = storage.move_memory(NEW_DIR, fname2, add_flags="SI") # Mark as Seen, Important
+#         cur_fname2 = storage.move_memory(NEW_DIR, fname2, add_flags="S,I") # Mark as Seen, Important
 #         print(f"Moved {fname2} to 'cur' as {cur_fname2}")
 
 #         # List 'cur'
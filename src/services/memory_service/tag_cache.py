@@ -0,0 +1,121 @@
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from ...models.memory_entry import MemoryEntry, MemoryMetadata
+from ...utils.logger import log
+from ...utils.exceptions import MemoryServiceError
+
+# --- Constants ---
+CACHE_DIR = ".cache" # Inside the Memdir root, outside tmp/new/cur
+TAG_CACHE_FILENAME = "tag_cache.db"
+
+
+class TagCache:
+    """
+    Persistent exact-match cache of AI metadata, keyed by a hash of the entry content.
+
+    Only the fields that describe the event (entry_type, source_service, payload) are hashed,
+    so repeated events (heartbeats, metrics, ...) reuse the metadata generated for the first one
+    instead of triggering another LLM call. Safe to share between worker threads.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tag_cache ("
+                "key TEXT PRIMARY KEY, metadata_json TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            # Pruning deletes by age, oldest first
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tag_cache_created_at ON tag_cache (created_at)")
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            log.error(f"Failed to open tag cache at {self.db_path}: {e}", exc_info=True)
+            raise MemoryServiceError(f"Failed to open tag cache at {self.db_path}: {e}") from e
+        log.debug(f"TagCache initialized at {self.db_path}")
+
+    @staticmethod
+    def make_key(entry: MemoryEntry, model_name: Optional[str] = None) -> str:
+        """Builds the cache key from the canonical JSON of the entry content (and tagging model)."""
+        canonical = json.dumps(
+            {
+                "model": model_name,
+                "entry_type": entry.entry_type,
+                "source_service": entry.source_service,
+                "payload": entry.payload,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[MemoryMetadata]:
+        """Returns the cached metadata for `key`, or None on a miss."""
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT metadata_json FROM tag_cache WHERE key = ?", (key,)).fetchone()
+                metadata = MemoryMetadata.model_validate_json(row[0]) if row else None
+            except Exception as e: # sqlite errors or a corrupt cached value
+                log.warning(f"Tag cache lookup failed for key {key}: {e}")
+                metadata = None
+
+            if metadata is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return metadata
+
+    def put(self, key: str, metadata: MemoryMetadata) -> None:
+        """Stores metadata under `key`, replacing any previous value."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tag_cache (key, metadata_json, created_at) VALUES (?, ?, ?)",
+                    (key, metadata.model_dump_json(), time.time())
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Failed to store tag cache entry {key}: {e}")
+
+    def prune(self, max_age_days: Optional[int] = None, max_count: Optional[int] = None) -> int:
+        """
+        Deletes cached metadata older than `max_age_days` and, beyond that, the oldest rows
+        until at most `max_count` remain. None or 0 disables the respective limit.
+
+        Returns:
+            The number of cache rows deleted.
+        """
+        deleted = 0
+        try:
+            with self._lock:
+                if max_age_days:
+                    cutoff = time.time() - max_age_days * 86400
+                    deleted += self._conn.execute("DELETE FROM tag_cache WHERE created_at < ?", (cutoff,)).rowcount
+                if max_count:
+                    deleted += self._conn.execute(
+                        "DELETE FROM tag_cache WHERE key IN ("
+                        "SELECT key FROM tag_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (max_count,)
+                    ).rowcount
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"Failed to prune tag cache at {self.db_path}: {e}")
+        if deleted:
+            log.info(f"Pruned {deleted} tag cache entries (max age: {max_age_days} days, max count: {max_count}).")
+        return deleted
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
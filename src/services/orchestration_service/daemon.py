@@ -149,6 +149,7 @@ class OrchestrationDaemon:
         try:
             processed_count = self.memory_organizer.process_new_memories()
             log.info(f"Memory organization task finished. Processed {processed_count} files.")
+            self.memory_organizer.prune_tag_cache() # Keep the tag cache bounded like the Memdir itself
             self._log_system_event("Memory Organization Run", {"processed_count": processed_count})
         except Exception as e:
             log.error(f"Error during scheduled memory organization: {e}", exc_info=True)
@@ -282,41 +283,45 @@ class OrchestrationDaemon:
         # --- Main Loop ---
         log.info("Entering main loop...")
         self._log_system_event("Main Loop Started")
-        while self._running:
-            now = datetime.now(timezone.utc)
+        try:
+            while self._running:
+                now = datetime.now(timezone.utc)
 
-            # Check if it's time for a trading cycle based on frequency
-            run_trade_cycle = False
-            if self._last_trade_cycle_time is None:
-                 run_trade_cycle = True # Run immediately on first start if market open
-            else:
-                 time_since_last_cycle = (now - self._last_trade_cycle_time).total_seconds()
-                 if time_since_last_cycle >= self._optimal_trading_frequency_sec:
-                      run_trade_cycle = True
-
-            if run_trade_cycle:
-                 # Run the trading cycle (includes market open check inside)
-                 self._run_trading_cycle()
-                 # Note: _run_trading_cycle updates _last_trade_cycle_time internally on start
-
-            # Run pending scheduled tasks
-            schedule.run_pending()
-
-            # Sleep interval - adjust dynamically?
-            # Sleep for a short duration to avoid busy-waiting
-            # Calculate sleep time based on next scheduled job and desired frequency check interval
-            idle_time = schedule.idle_seconds()
-            sleep_interval = config.MAIN_LOOP_SLEEP_INTERVAL # Base sleep
-            if idle_time is not None and idle_time > 0:
-                 # Sleep until the next job, but no more than the base interval
-                 # to allow checking the trading frequency condition reasonably often.
-                 sleep_interval = min(sleep_interval, idle_time)
-
-            # Ensure sleep interval is positive
-            sleep_interval = max(0.1, sleep_interval)
-
-            # log.debug(f"Sleeping for {sleep_interval:.2f} seconds...")
-            time.sleep(sleep_interval)
+                # Check if it's time for a trading cycle based on frequency
+                run_trade_cycle = False
+                if self._last_trade_cycle_time is None:
+                     run_trade_cycle = True # Run immediately on first start if market open
+                else:
+                     time_since_last_cycle = (now - self._last_trade_cycle_time).total_seconds()
+                     if time_since_last_cycle >= self._optimal_trading_frequency_sec:
+                          run_trade_cycle = True
+
+                if run_trade_cycle:
+                     # Run the trading cycle (includes market open check inside)
+                     self._run_trading_cycle()
+                     # Note: _run_trading_cycle updates _last_trade_cycle_time internally on start
+
+                # Run pending scheduled tasks
+                schedule.run_pending()
+
+                # Sleep interval - adjust dynamically?
+                # Sleep for a short duration to avoid busy-waiting
+                # Calculate sleep time based on next scheduled job and desired frequency check interval
+                idle_time = schedule.idle_seconds()
+                sleep_interval = config.MAIN_LOOP_SLEEP_INTERVAL # Base sleep
+                if idle_time is not None and idle_time > 0:
+                     # Sleep until the next job, but no more than the base interval
+                     # to allow checking the trading frequency condition reasonably often.
+                     sleep_interval = min(sleep_interval, idle_time)
+
+                # Ensure sleep interval is positive
+                sleep_interval = max(0.1, sleep_interval)
+
+                # log.debug(f"Sleeping for {sleep_interval:.2f} seconds...")
+                time.sleep(sleep_interval)
+        finally:
+            # Release the tag cache database even if the loop exits with an exception
+            self.memory_organizer.close()
 
         log.info("Orchestration Daemon run loop finished.")
         self._log_system_event("Main Loop Stopped")
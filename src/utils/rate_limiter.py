@@ -0,0 +1,38 @@
+"""Simple thread-safe token-bucket rate limiter for external API calls."""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter allowing `requests_per_minute` calls on average,
+    with bursts of up to `burst` calls. `acquire()` blocks until a token is available.
+    """
+
+    def __init__(self, requests_per_minute: int, burst: Optional[int] = None):
+        if requests_per_minute <= 0:
+            raise ValueError(f"requests_per_minute must be positive, got {requests_per_minute}")
+        self.rate_per_second = requests_per_minute / 60.0
+        self.capacity = float(burst if burst and burst > 0 else 1)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Adds tokens accrued since the last refill (caller must hold the lock)."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        """Blocks until a token can be taken from the bucket."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait_seconds) # Sleep outside the lock so other threads can refill/check
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Make the application importable (as `src.*`) once for the whole test suite,
+# regardless of the directory pytest is started from.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_path = os.path.join(project_root, 'src')
+for path in (project_root, src_path):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -1,14 +1,6 @@
 import pytest
-import os
-import sys
 from datetime import datetime
 
-# Adjust path to import from src
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-src_path = os.path.join(project_root, 'src')
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
 # Imports from the trading system
 from src.interfaces.notification import NotificationInterface
 from src.utils.exceptions import NotificationError, ConfigError
@@ -1,16 +1,9 @@
 import pytest
 import os
-import sys
 import json
 import uuid
 from unittest.mock import MagicMock, patch, mock_open
 
-# Adjust path to import from src
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-src_path = os.path.join(project_root, 'src')
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
 # Imports from the trading system
 from src.services.ai_service.processor import AIServiceProcessor, DEFAULT_PROMPT_FILENAME, AI_SERVICE_SOURCE
 from src.interfaces.large_language_model import LLMInterface
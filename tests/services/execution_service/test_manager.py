@@ -1,16 +1,8 @@
 import pytest
-import os
-import sys
 import uuid
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone # Added timezone
 
-# Adjust path to import from src
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-src_path = os.path.join(project_root, 'src')
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
 # Imports from the trading system
 from src.services.execution_service.manager import ExecutionServiceManager, EXECUTION_SERVICE_SOURCE
 from src.interfaces.brokerage import BrokerageInterface
@@ -0,0 +1,32 @@
+import pytest
+import shutil
+
+from src.services.memory_service.storage import MemoryStorage
+from src import config
+
+# --- Shared Memdir Fixtures ---
+
+@pytest.fixture(scope="session")
+def base_memdir(tmp_path_factory):
+    """Creates one MemoryStorage for the whole session in a temporary Memdir."""
+    # MemoryStorage reads config.MEMDIR_PATH only in __init__, so the override is kept
+    # just for construction instead of leaking into every test.
+    original_memdir_path = config.MEMDIR_PATH
+    config.MEMDIR_PATH = str(tmp_path_factory.mktemp("memdir") / "test_memdir")
+    try:
+        storage = MemoryStorage()
+    finally:
+        config.MEMDIR_PATH = original_memdir_path
+    return storage
+
+@pytest.fixture
+def memory_storage(base_memdir):
+    """Provides the session MemoryStorage with an empty Memdir (tmp/new/cur and caches cleared)."""
+    for child in base_memdir.memdir_root.iterdir():
+        if child.is_dir():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+    for path in (base_memdir.tmp_path, base_memdir.new_path, base_memdir.cur_path, base_memdir.index_path):
+        path.mkdir(parents=True, exist_ok=True)
+    return base_memdir
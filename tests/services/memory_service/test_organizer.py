@@ -1,20 +1,18 @@
 import pytest
 import os
-import sys
 import time
 import json
+import sqlite3
+import threading
 from unittest.mock import MagicMock
 from typing import Tuple
 
-# Adjust path to import from src
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-src_path = os.path.join(project_root, 'src')
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
 # Imports from the trading system
-from src.services.memory_service.storage import MemoryStorage, NEW_DIR, CUR_DIR
-from src.services.memory_service.organizer import MemoryOrganizer, ORGANIZER_SOURCE_SERVICE
+from src.services.memory_service.storage import MemoryStorage, NEW_DIR, CUR_DIR, split_flags
+from src.services.memory_service.organizer import (
+    MemoryOrganizer, ORGANIZER_SOURCE_SERVICE, ADAPTIVE_BATCH_INITIAL_SIZE, ADAPTIVE_BATCH_MAX_SIZE, ADAPTIVE_BATCH_WINDOW
+)
+from src.services.memory_service.tag_cache import TagCache
 from src.interfaces.large_language_model import LLMInterface
 from src.models.memory_entry import MemoryEntry, MemoryEntryType, MemoryMetadata
 from src.utils.exceptions import MemdirIOError, LLMError
@@ -22,34 +20,63 @@ from src import config
 
 # --- Fixtures ---
 
-# Reuse the MemoryStorage fixture from test_storage
-# Need to import it or redefine it here if running files separately
-@pytest.fixture
-def memory_storage(tmp_path):
-    """Provides a MemoryStorage instance using a temporary directory."""
-    original_memdir_path = config.MEMDIR_PATH
-    test_memdir = tmp_path / "test_memdir"
-    config.MEMDIR_PATH = str(test_memdir)
-    storage = MemoryStorage()
-    yield storage
-    config.MEMDIR_PATH = original_memdir_path
+# Default LLM response for metadata generation
+MOCK_METADATA_RESPONSE = {
+    "keywords": "mock, test, keyword",
+    "summary": "This is a mock summary generated by the LLM.",
+    "suggested_flags": ["Flag_Test", "Status_Success", "MockFlag"] # Include some valid and potentially invalid
+}
+
+# The memory_storage fixture is shared via conftest.py
 
 @pytest.fixture
 def mock_llm_interface():
     """Provides a mocked LLMInterface."""
     mock = MagicMock(spec=LLMInterface)
     # Default mock response for metadata generation
-    mock.generate_json_response.return_value = {
-        "keywords": "mock, test, keyword",
-        "summary": "This is a mock summary generated by the LLM.",
-        "suggested_flags": ["Flag_Test", "Status_Success", "MockFlag"] # Include some valid and potentially invalid
-    }
+    mock.generate_json_response.return_value = dict(MOCK_METADATA_RESPONSE)
     return mock
 
+class FakeLLM:
+    """
+    Lightweight stand-in for LLMInterface (no MagicMock overhead).
+    Only keeps a thread-safe call counter, so large-N runs don't grow memory per call.
+    """
+
+    def __init__(self, response=None):
+        self.response = response if response is not None else dict(MOCK_METADATA_RESPONSE)
+        self.call_count = 0
+        self._lock = threading.Lock()
+
+    def generate_json_response(self, prompt, **kwargs):
+        with self._lock: # Called from organizer worker threads
+            self.call_count += 1
+        return self.response
+
+@pytest.fixture
+def fake_llm():
+    """Provides a FakeLLM for tests that only check how often the LLM was called."""
+    return FakeLLM()
+
 @pytest.fixture
 def memory_organizer(memory_storage, mock_llm_interface):
     """Provides a MemoryOrganizer instance with mocked dependencies."""
-    return MemoryOrganizer(storage=memory_storage, llm_interface=mock_llm_interface)
+    with MemoryOrganizer(storage=memory_storage, llm_interface=mock_llm_interface) as organizer:
+        yield organizer
+
+@pytest.fixture
+def make_organizer(memory_storage):
+    """Builds extra MemoryOrganizers on the test Memdir and closes them when the test ends."""
+    organizers = []
+
+    def _make(llm_interface, **kwargs):
+        organizer = MemoryOrganizer(storage=memory_storage, llm_interface=llm_interface, **kwargs)
+        organizers.append(organizer)
+        return organizer
+
+    yield _make
+    for organizer in organizers:
+        organizer.close()
 
 # --- Helper Function ---
 
@@ -67,6 +94,14 @@ def test_organizer_initialization(memory_organizer, memory_storage, mock_llm_int
     assert memory_organizer.llm == mock_llm_interface
     assert memory_organizer.tagging_model == config.DEFAULT_LLM_MODEL
 
+def test_organizer_close_releases_tag_cache(memory_storage, mock_llm_interface):
+    """Tests that leaving the organizer context closes the tag cache database."""
+    with MemoryOrganizer(storage=memory_storage, llm_interface=mock_llm_interface) as organizer:
+        tag_cache_conn = organizer._tag_cache._conn
+        tag_cache_conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        tag_cache_conn.execute("SELECT 1")
+
 def test_process_single_entry_success(memory_organizer, memory_storage, mock_llm_interface):
     """Tests processing a single valid entry from 'new'."""
     # 1. Create a test file in 'new'
@@ -113,8 +148,8 @@ def test_process_single_entry_success(memory_organizer, memory_storage, mock_llm
     assert "Status_Success" in parsed_cur["flags"]
     # Check for dynamically added symbol flag
     assert f"Symbol_{payload['symbol'].upper()}" in parsed_cur["flags"]
-    # Check that invalid flags from mock response might be ignored (depends on implementation)
-    # assert "MockFlag" not in parsed_cur["flags"] # If filtering is strict
+    # Check that invalid flags from mock response are ignored
+    assert "MockFlag" not in parsed_cur["flags"]
 
     # 9. Verify original payload and other fields remain unchanged
     assert processed_entry.entry_id == original_entry.entry_id
@@ -122,6 +157,39 @@ def test_process_single_entry_success(memory_organizer, memory_storage, mock_llm
     assert processed_entry.source_service == original_entry.source_service
     assert processed_entry.payload == original_entry.payload
 
+def test_flag_pattern_filters_unknown_and_unsafe_flags():
+    """Tests the precompiled flag filter used for filename flags."""
+    from src.services.memory_service.organizer import _FLAG_PATTERN, ALLOWED_FLAGS
+    assert all(_FLAG_PATTERN.match(flag) for flag in ALLOWED_FLAGS)
+    assert _FLAG_PATTERN.match("Symbol_AAPL")
+    assert _FLAG_PATTERN.match("Flag_Test")
+    assert not _FLAG_PATTERN.match("MockFlag")
+    assert not _FLAG_PATTERN.match("Status_Bad Flag")
+    assert not _FLAG_PATTERN.match("Symbol_BRK.B")
+    assert not _FLAG_PATTERN.match("Importantly")
+
+def test_build_flag_suffix():
+    """Tests building the Maildir flag suffix for processed files."""
+    assert MemoryOrganizer._build_flag_suffix({"S", "Status_Success", "Flag_Test"}) == ":2,Flag_Test,S,Status_Success"
+    assert MemoryOrganizer._build_flag_suffix({"S"}) == ":2,S"
+    assert MemoryOrganizer._build_flag_suffix(set()) == ""
+
+def test_update_flags_round_trips_organizer_filename(memory_organizer, memory_storage):
+    """Tests that storage flag updates and queries keep the organizer's multi-character flags intact."""
+    new_filename, _ = create_test_entry_in_new(memory_storage, MemoryEntryType.TRADE, {"symbol": "AAPL", "qty": 1})
+    assert memory_organizer.process_single_entry(new_filename) is True
+    cur_filename = memory_storage.list_files(CUR_DIR)[0]
+    organizer_flags = split_flags(memory_storage._parse_filename(cur_filename)["flags"])
+    assert organizer_flags == {"S", "Flag_Test", "Status_Success", "Symbol_AAPL"}
+
+    updated_filename = memory_storage.update_flags(cur_filename, add_flags="Important", remove_flags="S")
+    updated_flags = split_flags(memory_storage._parse_filename(updated_filename)["flags"])
+    assert updated_flags == (organizer_flags - {"S"}) | {"Important"}
+    assert updated_filename.endswith(":2,Flag_Test,Important,Status_Success,Symbol_AAPL")
+
+    results = memory_storage.query_memories(flags_include=["Symbol_AAPL", "Important"], flags_exclude="S")
+    assert [filename for filename, _ in results] == [updated_filename]
+
 def test_process_single_entry_llm_error(memory_organizer, memory_storage, mock_llm_interface):
     """Tests processing when the LLM call fails."""
     # 1. Setup mock LLM to raise an error
@@ -170,15 +238,17 @@ def test_process_single_entry_read_error(memory_organizer, memory_storage, mock_
     # Ensure no files appeared in 'cur'
     assert not memory_storage.list_files(CUR_DIR)
 
-def test_process_new_memories_batch(memory_organizer, memory_storage, mock_llm_interface):
+def test_process_new_memories_batch(memory_storage, fake_llm, make_organizer):
     """Tests processing a batch of files."""
+    memory_organizer = make_organizer(fake_llm)
+
     # 1. Create multiple files in 'new'
     num_files = 5
-    new_filenames = [
-        create_test_entry_in_new(memory_storage, MemoryEntryType.SYSTEM_EVENT, {"i": i})[0]
+    new_filenames = memory_storage.bulk_save([
+        MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="Test", payload={"i": i})
         for i in range(num_files)
-    ]
-    assert len(memory_storage.list_files(NEW_DIR)) == num_files
+    ])
+    assert memory_storage.count_files(NEW_DIR) == num_files
 
     # 2. Process a batch smaller than the total
     batch_size = 3
@@ -186,9 +256,9 @@ def test_process_new_memories_batch(memory_organizer, memory_storage, mock_llm_i
     assert processed_count == batch_size
 
     # 3. Verify counts in 'new' and 'cur'
-    assert len(memory_storage.list_files(NEW_DIR)) == num_files - batch_size
-    assert len(memory_storage.list_files(CUR_DIR)) == batch_size
-    assert mock_llm_interface.generate_json_response.call_count == batch_size
+    assert memory_storage.count_files(NEW_DIR) == num_files - batch_size
+    assert memory_storage.count_files(CUR_DIR) == batch_size
+    assert fake_llm.call_count == batch_size
 
     # 4. Process remaining files
     processed_count_2 = memory_organizer.process_new_memories(batch_size=batch_size) # Process up to 3 more
@@ -196,8 +266,8 @@ def test_process_new_memories_batch(memory_organizer, memory_storage, mock_llm_i
 
     # 5. Verify 'new' is empty and 'cur' has all files
     assert not memory_storage.list_files(NEW_DIR)
-    assert len(memory_storage.list_files(CUR_DIR)) == num_files
-    assert mock_llm_interface.generate_json_response.call_count == num_files
+    assert memory_storage.count_files(CUR_DIR) == num_files
+    assert fake_llm.call_count == num_files
 
 def test_process_new_memories_empty(memory_organizer, memory_storage, mock_llm_interface):
     """Tests processing when the 'new' directory is empty."""
@@ -206,3 +276,223 @@ def test_process_new_memories_empty(memory_organizer, memory_storage, mock_llm_i
     assert processed_count == 0
     mock_llm_interface.generate_json_response.assert_not_called()
     assert not memory_storage.list_files(CUR_DIR)
+
+def test_process_new_memories_batched(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests tagging a batch of files with a single LLM call."""
+    # 1. Create multiple files in 'new'
+    num_files = 4
+    for i in range(num_files):
+        create_test_entry_in_new(memory_storage, MemoryEntryType.SYSTEM_EVENT, {"i": i})
+
+    # 2. Mock LLM returns one result per entry (the last one is deliberately missing)
+    batch_size = 3
+    mock_llm_interface.generate_json_response.return_value = [
+        {"idx": idx, "keywords": f"batch, {idx}", "summary": f"Summary {idx}.", "suggested_flags": ["Flag_SystemEvent"]}
+        for idx in range(batch_size - 1)
+    ]
+
+    processed_count = memory_organizer.process_new_memories_batched(batch_size=batch_size)
+    assert processed_count == batch_size
+    mock_llm_interface.generate_json_response.assert_called_once()
+
+    # 3. Verify counts in 'new' and 'cur'
+    assert memory_storage.count_files(NEW_DIR) == num_files - batch_size
+    cur_files = memory_storage.list_files(CUR_DIR)
+    assert len(cur_files) == batch_size
+
+    # 4. Entries answered by the LLM got metadata, the unanswered one was moved without it
+    entries = [memory_storage.read_memory(CUR_DIR, f) for f in cur_files]
+    with_metadata = [e for e in entries if e.metadata is not None]
+    assert len(with_metadata) == batch_size - 1
+    assert {e.metadata.summary for e in with_metadata} == {"Summary 0.", "Summary 1."}
+
+def test_process_new_memories_batched_single_fallback(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests that a batch size of 1 uses the single-entry prompt path."""
+    create_test_entry_in_new(memory_storage, MemoryEntryType.SYSTEM_EVENT, {"i": 0})
+    processed_count = memory_organizer.process_new_memories_batched(batch_size=1)
+    assert processed_count == 1
+    call_args = mock_llm_interface.generate_json_response.call_args
+    assert "Memory Entry JSON:" in call_args.kwargs["prompt"]
+    assert memory_storage.count_files(CUR_DIR) == 1
+
+def test_process_new_memories_batched_adaptive(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests that batch_size=None starts at the initial size and only grows after a full window."""
+    num_files = ADAPTIVE_BATCH_WINDOW * ADAPTIVE_BATCH_INITIAL_SIZE + 2
+    memory_storage.bulk_save([
+        MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="Test", payload={"i": i})
+        for i in range(num_files)
+    ])
+    mock_llm_interface.generate_json_response.return_value = {"results": []}
+
+    for run in range(ADAPTIVE_BATCH_WINDOW):
+        assert memory_organizer.get_batch_stats()["next_batch_size"] == ADAPTIVE_BATCH_INITIAL_SIZE
+        assert memory_organizer.process_new_memories_batched(batch_size=None) == ADAPTIVE_BATCH_INITIAL_SIZE
+
+    # A full window at the initial size, so the next run probes a larger batch
+    stats = memory_organizer.get_batch_stats()
+    assert stats["batches"] == ADAPTIVE_BATCH_WINDOW
+    assert stats["rows"] == ADAPTIVE_BATCH_WINDOW * ADAPTIVE_BATCH_INITIAL_SIZE
+    assert set(stats["latency_per_row_by_size"]) == {ADAPTIVE_BATCH_INITIAL_SIZE}
+    assert stats["next_batch_size"] == ADAPTIVE_BATCH_INITIAL_SIZE * 2
+
+    # The remaining files form a short batch, which does not measure the larger size
+    assert memory_organizer.process_new_memories_batched(batch_size=None) == 2
+    stats = memory_organizer.get_batch_stats()
+    assert stats["rows"] == num_files
+    assert set(stats["latency_per_row_by_size"]) == {ADAPTIVE_BATCH_INITIAL_SIZE}
+    assert memory_storage.count_files(CUR_DIR) == num_files
+
+def replay_adaptive_batches(organizer, batch_latency, runs=40):
+    """Feeds `runs` full adaptive batches with latency `batch_latency(size)` into the tuner."""
+    sizes = []
+    for _ in range(runs):
+        size = organizer.get_batch_stats()["next_batch_size"]
+        sizes.append(size)
+        organizer._record_batch_latency(size, size, batch_latency(size))
+    return sizes
+
+def test_adaptive_batch_backs_off_when_larger_batches_are_slower(memory_organizer):
+    """Tests that a size slower per entry than the previous one is abandoned, not grown past."""
+    # Latency per entry is lowest at 4 and grows with the batch size beyond it
+    sizes = replay_adaptive_batches(memory_organizer, lambda size: 0.5 + 0.05 * size ** 2)
+    assert max(sizes) == ADAPTIVE_BATCH_INITIAL_SIZE * 2 # Probed once...
+    assert sizes.count(ADAPTIVE_BATCH_INITIAL_SIZE * 2) == 1 # ...then backed off
+    assert memory_organizer.get_batch_stats()["next_batch_size"] == ADAPTIVE_BATCH_INITIAL_SIZE
+
+def test_adaptive_batch_grows_while_latency_per_entry_falls(memory_organizer):
+    """Tests that the tuner grows window by window up to the maximum while batching keeps paying off."""
+    sizes = replay_adaptive_batches(memory_organizer, lambda size: 2.0 + 0.01 * size)
+    assert sizes[:ADAPTIVE_BATCH_WINDOW + 1] == [ADAPTIVE_BATCH_INITIAL_SIZE] * ADAPTIVE_BATCH_WINDOW + [ADAPTIVE_BATCH_INITIAL_SIZE * 2]
+    assert memory_organizer.get_batch_stats()["next_batch_size"] == ADAPTIVE_BATCH_MAX_SIZE
+
+def test_adaptive_batch_counts_tag_cache_hits_as_batch_rows(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests that a batch partly served from the tag cache still counts as a full batch."""
+    entries = [
+        MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="Test", payload={"i": i})
+        for i in range(ADAPTIVE_BATCH_INITIAL_SIZE)
+    ]
+    memory_storage.bulk_save(entries)
+    cached = MemoryMetadata(keywords=["cached"], summary="Cached summary.", suggested_flags=[])
+    for entry in entries[:2]:
+        memory_organizer._tag_cache.put(TagCache.make_key(entry, memory_organizer.tagging_model), cached)
+    mock_llm_interface.generate_json_response.return_value = {"results": []}
+
+    assert memory_organizer.process_new_memories_batched(batch_size=None) == ADAPTIVE_BATCH_INITIAL_SIZE
+    stats = memory_organizer.get_batch_stats()
+    assert stats["rows"] == ADAPTIVE_BATCH_INITIAL_SIZE
+    assert set(stats["latency_per_row_by_size"]) == {ADAPTIVE_BATCH_INITIAL_SIZE}
+
+def test_process_new_memories_batched_adaptive_shrinks_on_failure(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests that a failed batch LLM call halves the next adaptive batch size."""
+    memory_storage.bulk_save([
+        MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="Test", payload={"i": i})
+        for i in range(ADAPTIVE_BATCH_INITIAL_SIZE)
+    ])
+    mock_llm_interface.generate_json_response.side_effect = LLMError("Request timed out")
+
+    # Entries are still moved, just without metadata
+    processed_count = memory_organizer.process_new_memories_batched(batch_size=None)
+    assert processed_count == ADAPTIVE_BATCH_INITIAL_SIZE
+
+    stats = memory_organizer.get_batch_stats()
+    assert stats["failures"] == 1
+    assert stats["batches"] == 0
+    assert stats["next_batch_size"] == ADAPTIVE_BATCH_INITIAL_SIZE // 2
+
+def test_process_new_memories_batched_explicit_size_skips_tuning(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests that explicitly sized batches neither record stats nor change the adaptive batch size."""
+    batch_size = ADAPTIVE_BATCH_INITIAL_SIZE * 2
+    memory_storage.bulk_save([
+        MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="Test", payload={"i": i})
+        for i in range(batch_size)
+    ])
+    mock_llm_interface.generate_json_response.return_value = {"results": []}
+
+    processed_count = memory_organizer.process_new_memories_batched(batch_size=batch_size)
+    assert processed_count == batch_size
+
+    stats = memory_organizer.get_batch_stats()
+    assert stats["batches"] == 0
+    assert stats["next_batch_size"] == ADAPTIVE_BATCH_INITIAL_SIZE
+
+def test_process_new_memories_concurrent(memory_storage, mock_llm_interface, make_organizer):
+    """Tests that LLM calls in a batch run concurrently, bounded by max_concurrency."""
+    max_concurrency = 2
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+    response = mock_llm_interface.generate_json_response.return_value
+    # Each call is held until max_concurrency calls are in flight, so the peak does not depend on timing
+    all_in_flight = threading.Barrier(max_concurrency, timeout=5)
+
+    def slow_llm_call(**kwargs):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        all_in_flight.wait()
+        with lock:
+            active["now"] -= 1
+        return response
+
+    mock_llm_interface.generate_json_response.side_effect = slow_llm_call
+    organizer = make_organizer(mock_llm_interface, max_concurrency=max_concurrency)
+    for i in range(4):
+        create_test_entry_in_new(memory_storage, MemoryEntryType.SYSTEM_EVENT, {"i": i})
+
+    assert organizer.process_new_memories(batch_size=4) == 4
+    assert active["peak"] == max_concurrency
+    assert memory_storage.count_files(CUR_DIR) == 4
+
+def test_tag_cache_reuses_metadata_for_identical_payloads(memory_organizer, memory_storage, mock_llm_interface):
+    """Tests that repeated events with the same content are tagged only once."""
+    for _ in range(3):
+        create_test_entry_in_new(memory_storage, MemoryEntryType.METRIC, {"heartbeat": "ok"})
+    create_test_entry_in_new(memory_storage, MemoryEntryType.METRIC, {"heartbeat": "degraded"})
+
+    # Sequential processing keeps first-miss/then-hit ordering deterministic
+    for filename in sorted(memory_storage.list_files(NEW_DIR)):
+        assert memory_organizer.process_single_entry(filename) is True
+
+    assert mock_llm_interface.generate_json_response.call_count == 2
+    assert memory_organizer._tag_cache.hits == 2
+    assert memory_organizer._tag_cache.misses == 2
+    for filename in memory_storage.list_files(CUR_DIR):
+        processed_entry = memory_storage.read_memory(CUR_DIR, filename)
+        assert processed_entry.metadata.summary == "This is a mock summary generated by the LLM."
+
+def test_tag_cache_persists_across_organizers(memory_organizer, memory_storage, mock_llm_interface, make_organizer):
+    """Tests that the tag cache is stored on disk inside the Memdir."""
+    filename, _ = create_test_entry_in_new(memory_storage, MemoryEntryType.METRIC, {"heartbeat": "ok"})
+    assert memory_organizer.process_single_entry(filename) is True
+    assert (memory_storage.memdir_root / ".cache" / "tag_cache.db").exists()
+
+    new_organizer = make_organizer(mock_llm_interface)
+    filename, _ = create_test_entry_in_new(memory_storage, MemoryEntryType.METRIC, {"heartbeat": "ok"})
+    assert new_organizer.process_single_entry(filename) is True
+    assert new_organizer._tag_cache.hits == 1
+    assert mock_llm_interface.generate_json_response.call_count == 1
+
+def test_tag_cache_prune_by_age_and_count(memory_organizer):
+    """Tests that pruning drops expired tag cache rows first, then the oldest beyond the count limit."""
+    tag_cache = memory_organizer._tag_cache
+    metadata = MemoryMetadata(keywords=["mock"], summary="Cached summary.", suggested_flags=[])
+    for key in ("expired", "older", "newest"):
+        tag_cache.put(key, metadata)
+    now = time.time()
+    for key, age_seconds in (("expired", 40 * 86400), ("older", 2), ("newest", 1)):
+        tag_cache._conn.execute("UPDATE tag_cache SET created_at = ? WHERE key = ?", (now - age_seconds, key))
+
+    assert tag_cache.prune(max_age_days=30) == 1
+    assert tag_cache.get("expired") is None
+    assert tag_cache.prune(max_count=1) == 1
+    assert tag_cache.get("older") is None
+    assert tag_cache.get("newest") == metadata
+    # Zero disables both limits, as for Memdir pruning
+    assert tag_cache.prune(max_age_days=0, max_count=0) == 0
+
+def test_generate_metadata_handles_unhashable_payload(memory_organizer, mock_llm_interface):
+    """Tests that a payload the tag cache cannot key is handled like any other tagging failure."""
+    entry = MemoryEntry(entry_type=MemoryEntryType.METRIC, source_service="Test", payload={})
+    entry.payload["self"] = entry.payload # Circular reference, cannot be serialized
+    assert memory_organizer._generate_metadata(entry) is None
+    assert memory_organizer._generate_metadata_batch([entry]) == [None]
+    mock_llm_interface.generate_json_response.assert_not_called()
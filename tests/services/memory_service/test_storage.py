@@ -1,42 +1,19 @@
 import pytest
 import os
-import sys
 import time
 import shutil
 from datetime import datetime, timezone, timedelta
 import re
 from typing import Tuple # Ensure Tuple is imported if used elsewhere
 
-# Adjust path to import from src
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-src_path = os.path.join(project_root, 'src')
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
 # Imports from the trading system
 # Import HOSTNAME constant directly
-from src.services.memory_service.storage import MemoryStorage, TMP_DIR, NEW_DIR, CUR_DIR, FILENAME_REGEX, HOSTNAME
+from src.services.memory_service.storage import TMP_DIR, NEW_DIR, CUR_DIR, FILENAME_REGEX, HOSTNAME, MMAP_READ_THRESHOLD_BYTES, _parse_filename_cached, split_flags, join_flags
 from src.models.memory_entry import MemoryEntry, MemoryEntryType
 from src.utils.exceptions import MemdirIOError
-from src import config
 
 # --- Test Fixture ---
-
-@pytest.fixture
-def memory_storage(tmp_path):
-    """Provides a MemoryStorage instance using a temporary directory."""
-    # Override the config path for the duration of the test
-    original_memdir_path = config.MEMDIR_PATH
-    test_memdir = tmp_path / "test_memdir"
-    config.MEMDIR_PATH = str(test_memdir)
-
-    storage = MemoryStorage() # Initializes with the overridden path
-
-    yield storage # Provide the instance to the test
-
-    # Teardown: Restore original config path (though not strictly necessary with tmp_path)
-    config.MEMDIR_PATH = original_memdir_path
-    # tmp_path fixture handles directory cleanup automatically
+# The memory_storage fixture is shared via conftest.py
 
 # --- Filename Parsing Tests ---
 
@@ -77,6 +54,16 @@ def test_parse_filename_invalid(memory_storage):
     assert memory_storage._parse_filename("123.uuid") is None
     assert memory_storage._parse_filename(f"{time.time_ns()}.uuid.host:invalid") is None
 
+def test_parse_filename_cached(memory_storage):
+    """Tests that repeated parses hit the cache and return independent copies."""
+    filename = f"{time.time_ns()}.cache-uuid.test-host:2,S"
+    hits_before = _parse_filename_cached.cache_info().hits
+    first = memory_storage._parse_filename(filename)
+    first["flags"] = "mutated"
+    second = memory_storage._parse_filename(filename)
+    assert _parse_filename_cached.cache_info().hits == hits_before + 1
+    assert second["flags"] == "S"
+
 # --- Save and Read Tests ---
 
 def test_save_and_read_memory(memory_storage):
@@ -111,6 +98,27 @@ def test_save_and_read_memory(memory_storage):
     except (MemdirIOError, FileNotFoundError) as e:
         pytest.fail(f"read_memory failed: {e}")
 
+def test_bulk_save(memory_storage):
+    """Tests saving several entries at once."""
+    entries = [MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="pytest", payload={"i": i}) for i in range(3)]
+    filenames = memory_storage.bulk_save(entries)
+    assert len(filenames) == 3
+    assert memory_storage.list_files(NEW_DIR) == sorted(filenames)
+    assert not os.listdir(memory_storage.tmp_path)
+    for filename, entry in zip(filenames, entries):
+        assert memory_storage.read_memory(NEW_DIR, filename).entry_id == entry.entry_id
+
+def test_save_and_read_large_memory(memory_storage):
+    """Tests reading back an entry large enough to be parsed from an mmap."""
+    entry_data = {"blob": "x" * (MMAP_READ_THRESHOLD_BYTES * 2)}
+    entry = MemoryEntry(entry_type=MemoryEntryType.RAW_LLM_INTERACTION, source_service="pytest", payload=entry_data)
+    new_filename = memory_storage.save_memory(entry)
+    assert os.path.getsize(memory_storage.new_path / new_filename) > MMAP_READ_THRESHOLD_BYTES
+
+    read_entry = memory_storage.read_memory(NEW_DIR, new_filename)
+    assert read_entry.entry_id == entry.entry_id
+    assert read_entry.payload == entry_data
+
 def test_read_non_existent(memory_storage):
     """Tests reading a non-existent file."""
     with pytest.raises(FileNotFoundError):
@@ -118,9 +126,9 @@ def test_read_non_existent(memory_storage):
     with pytest.raises(FileNotFoundError):
         memory_storage.read_memory(CUR_DIR, "non_existent_file.json")
 
-def test_read_invalid_json(memory_storage, tmp_path):
+def test_read_invalid_json(memory_storage):
     """Tests reading a file with invalid JSON content."""
-    invalid_file = tmp_path / "test_memdir" / NEW_DIR / "invalid.json"
+    invalid_file = memory_storage.new_path / "invalid.json"
     invalid_file.write_text("this is not json")
     with pytest.raises(MemdirIOError, match="JSON decode error"):
         memory_storage.read_memory(NEW_DIR, "invalid.json")
@@ -144,7 +152,7 @@ def test_move_memory_new_to_cur(memory_storage):
         # Check filename includes flags
         parsed_cur = memory_storage._parse_filename(cur_filename)
         assert parsed_cur is not None
-        assert "S" in parsed_cur["flags"]
+        assert "S" in split_flags(parsed_cur["flags"])
 
         # Read back from 'cur' to be sure
         read_entry = memory_storage.read_memory(CUR_DIR, cur_filename)
@@ -169,7 +177,7 @@ def test_update_flags(memory_storage):
         assert os.path.exists(cur_filepath_si)
         parsed_si = memory_storage._parse_filename(cur_filename_si)
         assert parsed_si is not None
-        assert set(parsed_si["flags"]) == {"S", "I"}
+        assert split_flags(parsed_si["flags"]) == {"S", "I"}
 
         # Remove 'S' flag, add 'P' (Processed)
         cur_filename_ip = memory_storage.update_flags(cur_filename_si, add_flags="P", remove_flags="S")
@@ -178,10 +186,10 @@ def test_update_flags(memory_storage):
         assert os.path.exists(cur_filepath_ip)
         parsed_ip = memory_storage._parse_filename(cur_filename_ip)
         assert parsed_ip is not None
-        assert set(parsed_ip["flags"]) == {"I", "P"}
+        assert split_flags(parsed_ip["flags"]) == {"I", "P"}
 
         # Remove all flags
-        cur_filename_none = memory_storage.update_flags(cur_filename_ip, remove_flags="IP")
+        cur_filename_none = memory_storage.update_flags(cur_filename_ip, remove_flags="I,P")
         cur_filepath_none = os.path.join(memory_storage.cur_path, cur_filename_none)
         assert not os.path.exists(cur_filepath_ip)
         assert os.path.exists(cur_filepath_none)
@@ -192,6 +200,13 @@ def test_update_flags(memory_storage):
     except (MemdirIOError, FileNotFoundError) as e:
         pytest.fail(f"update_flags failed: {e}")
 
+def test_split_and_join_flags():
+    """Tests that flags round-trip through the comma-separated filename form."""
+    assert split_flags("S,Status_Success,Symbol_AAPL") == {"S", "Status_Success", "Symbol_AAPL"}
+    assert split_flags(["S", "Important"]) == {"S", "Important"}
+    assert split_flags("") == split_flags(None) == set()
+    assert join_flags({"Symbol_AAPL", "S", "Important"}) == "Important,S,Symbol_AAPL"
+
 def test_update_flags_non_existent(memory_storage):
     """Tests updating flags for a non-existent file."""
     with pytest.raises(FileNotFoundError):
@@ -209,6 +224,31 @@ def test_list_files(memory_storage):
     assert set(memory_storage.list_files(CUR_DIR)) == set(fnames_cur)
     assert memory_storage.list_files(TMP_DIR) == [] # tmp should be empty
 
+def test_list_files_sorted_and_skips_directories(memory_storage):
+    """Tests that list_files returns file names only, sorted oldest first."""
+    fnames_new = [memory_storage.save_memory(MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="pytest", payload={"i": i})) for i in range(3)]
+    (memory_storage.new_path / "subdir").mkdir()
+
+    assert memory_storage.list_files(NEW_DIR) == sorted(fnames_new)
+    assert memory_storage.list_files(CUR_DIR) == [] # 'cur/index' directory is not listed
+
+def test_count_files(memory_storage):
+    """Tests counting files in 'new' and 'cur'."""
+    assert memory_storage.count_files(NEW_DIR) == 0
+    fnames_new = [memory_storage.save_memory(MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="pytest", payload={"i": i})) for i in range(3)]
+    memory_storage.move_memory(NEW_DIR, fnames_new[0], add_flags="S")
+    assert memory_storage.count_files(NEW_DIR) == 2
+    assert memory_storage.count_files(CUR_DIR) == 1 # 'cur/index' directory is not counted
+
+def test_iter_files_is_lazy(memory_storage):
+    """Tests that iter_files yields the same names as list_files, lazily."""
+    fnames_new = [memory_storage.save_memory(MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="pytest", payload={"i": i})) for i in range(3)]
+    files_iter = memory_storage.iter_files(NEW_DIR)
+    assert not isinstance(files_iter, list)
+    assert sorted(files_iter) == memory_storage.list_files(NEW_DIR) == sorted(fnames_new)
+    with pytest.raises(ValueError):
+        next(memory_storage.iter_files("invalid"))
+
 def test_query_memories_basic(memory_storage):
     """Tests basic querying without complex filters."""
     num_files = 5
@@ -228,8 +268,8 @@ def test_query_memories_by_flags(memory_storage):
     f2 = memory_storage.save_memory(MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="pytest", payload={"i": 2})) # Use valid type
     f3 = memory_storage.save_memory(MemoryEntry(entry_type=MemoryEntryType.SYSTEM_EVENT, source_service="pytest", payload={"i": 3})) # Use valid type
 
-    cf1 = memory_storage.move_memory(NEW_DIR, f1, add_flags="SA") # Seen, Alert
-    cf2 = memory_storage.move_memory(NEW_DIR, f2, add_flags="SP") # Seen, Processed
+    cf1 = memory_storage.move_memory(NEW_DIR, f1, add_flags="S,A") # Seen, Alert
+    cf2 = memory_storage.move_memory(NEW_DIR, f2, add_flags="S,P") # Seen, Processed
     cf3 = memory_storage.move_memory(NEW_DIR, f3, add_flags="S")  # Seen
 
     # Include S -> should get all 3
@@ -246,8 +286,8 @@ def test_query_memories_by_flags(memory_storage):
     assert len(res_p) == 1
     assert res_p[0][0] == cf2
 
-    # Include SP -> should get cf2
-    res_sp = memory_storage.query_memories(flags_include="SP")
+    # Include S and P -> should get cf2
+    res_sp = memory_storage.query_memories(flags_include="S,P")
     assert len(res_sp) == 1
     assert res_sp[0][0] == cf2
 
@@ -309,7 +349,7 @@ def test_prune_memories_by_age(memory_storage):
     fname2 = f"{ts2}.{uid}2.{hostname}:2,S"
     (memory_storage.cur_path / fname2).touch()
 
-    assert len(memory_storage.list_files(CUR_DIR)) == 2
+    assert memory_storage.count_files(CUR_DIR) == 2
 
     # Prune files older than 1 day
     deleted_age, deleted_count = memory_storage.prune_memories(max_age_days=1)
@@ -326,7 +366,7 @@ def test_prune_memories_by_count(memory_storage):
     time.sleep(0.01)
     fnames_cur = [memory_storage.move_memory(NEW_DIR, fname, add_flags="S") for fname in fnames_new]
 
-    assert len(memory_storage.list_files(CUR_DIR)) == num_files
+    assert memory_storage.count_files(CUR_DIR) == num_files
 
     # Prune to keep only 2 files (should delete the 3 oldest)
     max_count = 2
@@ -364,7 +404,7 @@ def test_prune_memories_combined(memory_storage):
     fname4 = f"{ts4}.{uid}4.{hostname}:2,S"
     (memory_storage.cur_path / fname4).touch()
 
-    assert len(memory_storage.list_files(CUR_DIR)) == 4
+    assert memory_storage.count_files(CUR_DIR) == 4
 
     # Prune older than 1.5 days AND keep max 2
     deleted_age, deleted_count = memory_storage.prune_memories(max_age_days=1.5, max_count=2)
@@ -1,16 +1,9 @@
 import pytest
 import os
-import sys
 import uuid
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
 
-# Adjust path to import from src
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-src_path = os.path.join(project_root, 'src')
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
-
 # Imports from the trading system
 from src.interfaces.brokerage import BrokerageInterface
 from src.interfaces.large_language_model import LLMInterface
@@ -63,10 +56,13 @@ def memory_storage_e2e(tmp_path):
     original_memdir_path = config.MEMDIR_PATH
     test_memdir = tmp_path / "e2e_memdir"
     config.MEMDIR_PATH = str(test_memdir)
-    storage = MemoryStorage()
-    print(f"\n[E2E Setup] Using temporary Memdir: {test_memdir}")
-    yield storage
-    config.MEMDIR_PATH = original_memdir_path
+    try:
+        storage = MemoryStorage()
+        print(f"\n[E2E Setup] Using temporary Memdir: {test_memdir}")
+        yield storage
+    finally:
+        # Always restore, even if setup fails, so a reused (xdist) worker doesn't leak the path
+        config.MEMDIR_PATH = original_memdir_path
 
 # Fixture to provide initialized services for testing cycles
 @pytest.fixture
@@ -0,0 +1,25 @@
+import pytest
+import time
+
+from src.utils.rate_limiter import RateLimiter
+
+def test_rate_limiter_allows_burst_without_waiting():
+    """Tests that calls within the burst capacity are not delayed."""
+    limiter = RateLimiter(requests_per_minute=60, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+def test_rate_limiter_throttles_after_burst():
+    """Tests that calls beyond the burst wait for tokens to refill."""
+    limiter = RateLimiter(requests_per_minute=600, burst=1) # 10 tokens per second
+    limiter.acquire()
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.08
+
+def test_rate_limiter_invalid_rate():
+    """Tests that a non-positive rate is rejected."""
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_minute=0)